@@ -9,38 +9,47 @@ This agent uses the bee delegation system with:
 - Database integration for product data and memory persistence
 """
 
-from typing import Literal
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+import httpx
+import tiktoken
+from functools import lru_cache
+from typing import List, Literal, Union
 from langgraph.graph import StateGraph, START, END
+from langgraph.store.base import BaseStore, PutOp
+from langgraph.types import Send
 from langchain_core.runnables import RunnableConfig
-from langchain_core.messages import merge_message_runs, HumanMessage, SystemMessage, RemoveMessage
+from langchain_core.messages import merge_message_runs, AIMessage, HumanMessage, SystemMessage, RemoveMessage, ToolMessage
 from langchain_core.tools import tool
 
 from langchain_openai import ChatOpenAI
 from trustcall import create_extractor
-from datetime import datetime
 import uuid
 
 # Import state and schemas
 from my_agent.memory_agent.state import BargainBMemoryState
-from my_agent.memory_agent.schemas import UserProfile, ShoppingMemory, Instructions
+from my_agent.memory_agent.schemas import UserProfile, ShoppingMemory
 
 # Import bee system components
 from my_agent.memory_agent.beeb_supervisor import (
     create_beeb_supervisor,
+    current_time_bucket,
     _format_semantic_memory,
     _format_episodic_memories,
     _format_procedural_memory
 )
 from my_agent.memory_agent.scout_bee import create_scout_bee
-from my_agent.memory_agent.memory_bee import create_memory_bee
-from my_agent.memory_agent.scribe_bee import create_scribe_bee
 
 # Import database utilities
 try:
     from my_agent.utils.database import log_message_truncation
 except ImportError:
     def log_message_truncation(user_id: str, thread_id: str, original_count: int, truncated_count: int, summary: str):
-        print(f"📝 Mock log: Truncated {original_count} to {truncated_count} messages for {user_id}")
+        logger.debug("📝 Mock log: Truncated %s to %s messages for %s", original_count, truncated_count, user_id)
 
 # Import persistence layer for conversation summaries
 from my_agent.memory_agent.simple_persistence import (
@@ -49,6 +58,30 @@ from my_agent.memory_agent.simple_persistence import (
     log_message_truncation as log_truncation_db
 )
 
+logger = logging.getLogger(__name__)
+
+# Most existing memories per namespace handed to Trustcall for patching
+MEMORY_SEARCH_LIMIT = 50
+
+# Number of recent user/assistant messages used to update instructions
+INSTRUCTIONS_CONTEXT_MESSAGES = 6
+
+# Summarization prompts, appended after the conversation history
+CREATE_SUMMARY_PROMPT = "Create a summary of the conversation above:"
+EXTEND_SUMMARY_PROMPT = """This is summary of the conversation to date: {summary}
+
+Extend the summary by taking into account the new messages above:"""
+
+# Summarize once the conversation grows past this many messages (override with BB_SUMMARY_AT)
+SUMMARIZATION_THRESHOLD = int(os.getenv("BB_SUMMARY_AT", "20"))
+
+# Also summarize once the history grows past this many tokens, so a few long
+# messages trigger it too (override with BB_SUMMARY_TOKENS)
+SUMMARIZATION_TOKEN_THRESHOLD = int(os.getenv("BB_SUMMARY_TOKENS", "8000"))
+
+# Most recent messages kept in the state after summarization
+SUMMARY_KEEP_MESSAGES = 2
+
 # Missing constants from mem.md patterns
 TRUSTCALL_INSTRUCTION = """Reflect on following interaction. 
 
@@ -70,30 +103,30 @@ Your current instructions are:
 {current_instructions}
 </current_instructions>"""
 
-# Initialize the language model
-model = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-
-# Create extractors for each memory type following mem.md patterns
-user_profile_extractor = create_extractor(
-    model,
-    tools=[UserProfile],
-    tool_choice="UserProfile",
-    enable_inserts=True,
+# Initialize the language model with a shared async HTTP client so every
+# node reuses the same pooled connections to OpenAI. It handles the Trustcall
+# extraction and summarization utility calls, separate from Beeb's chat model
+# (override with BB_EXTRACT_MODEL)
+http_async_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(30.0, connect=3.0),
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
 )
+model = ChatOpenAI(model=os.getenv("BB_EXTRACT_MODEL", "gpt-4o-mini"), temperature=0, max_retries=2, http_async_client=http_async_client)
 
-shopping_memory_extractor = create_extractor(
-    model,
-    tools=[ShoppingMemory],
-    tool_choice="ShoppingMemory",
-    enable_inserts=True,
-)
+# Rewriting the short instructions blob only needs a small, fast model
+# (override with BB_INSTRUCTIONS_MODEL)
+instructions_model = ChatOpenAI(model=os.getenv("BB_INSTRUCTIONS_MODEL", "gpt-4.1-nano"), temperature=0, max_retries=2, http_async_client=http_async_client)
 
-instructions_extractor = create_extractor(
-    model,
-    tools=[Instructions],
-    tool_choice="Instructions",
-    enable_inserts=True,
-)
+# Trustcall extractors following mem.md patterns, built on first use and reused
+@lru_cache(maxsize=None)
+def _get_extractor(*tools):
+    """Get the extractor for the given memory schemas (parallel tool calls when several)."""
+    return create_extractor(
+        model,
+        tools=list(tools),
+        tool_choice=tools[0].__name__ if len(tools) == 1 else "any",
+        enable_inserts=True,
+    )
 
 # Spy class from mem.md for visibility into Trustcall updates
 class Spy:
@@ -101,42 +134,64 @@ class Spy:
         self.called_tools = []
 
     def __call__(self, run):
-        # Collect information about the tool calls made by the extractor.
-        q = [run]
+        # Collect information about the tool calls made by the extractor,
+        # walking the run tree breadth-first
+        q = deque([run])
+        popleft, enqueue = q.popleft, q.extend
+        extend = self.called_tools.extend
         while q:
-            run = q.pop()
-            if hasattr(run, 'tool_calls') and run.tool_calls:
-                self.called_tools.extend(
-                    [
-                        {
-                            "name": tool_call["name"],
-                            "args": tool_call["args"],
-                        }
-                        for tool_call in run.tool_calls
-                    ]
-                )
-            if hasattr(run, 'steps'):
-                for step in run.steps:
-                    q.append(step)
+            run = popleft()
+            child_runs = run.child_runs
+            if child_runs:
+                enqueue(child_runs)
+            if run.run_type == "chat_model":
+                extend(run.outputs["generations"][0][0]["message"]["kwargs"]["tool_calls"])
 
 def extract_tool_info(tool_calls, schema_name="Memory"):
-    """Extract tool information from Trustcall runs"""
-    return [
-        {
-            "tool_name": tool_call.get("name", "Unknown"),
-            "args": tool_call.get("args", {}),
-            "schema": schema_name
-        }
-        for tool_call in tool_calls
-    ]
-
-# Initialize bee system components
-beeb_supervisor = create_beeb_supervisor()
-scout_bee = create_scout_bee()
-memory_bee = create_memory_bee()
-scribe_bee = create_scribe_bee()
-
-def beeb_main_node(state: BargainBMemoryState, config: RunnableConfig):
+    """Describe the Trustcall updates and insertions captured by Spy in one pass."""
+    parts = []
+    for call in tool_calls:
+        name, args = call["name"], call["args"]
+        if name == "PatchDoc":
+            patches = args.get("patches") or [{}]
+            parts.append(f"Document {args['json_doc_id']} updated:\n"
+                         f"Plan: {args['planned_edits']}\n"
+                         f"Updated content: {patches[0].get('value')}")
+        elif name == schema_name:
+            parts.append(f"New {schema_name} created:\nContent: {args}")
+    return "\n\n".join(parts) or f"No {schema_name} changes detected"
+
+# For now, use empty memories for Trustcall system (separate from conversation summaries).
+# The inputs never change, so the formatted context is built once.
+# TODO: Implement proper Trustcall memory loading when needed
+EMPTY_MEMORY_CONTEXT = {
+    "semantic_memory": _format_semantic_memory(None),
+    "episodic_memories": _format_episodic_memories([]),
+    "procedural_memory": _format_procedural_memory(None),
+}
+
+# Bee system components, built on first use and reused. Memory and Scribe
+# work runs through the update and summarize functions below.
+@lru_cache(maxsize=1)
+def _get_beeb_supervisor():
+    return create_beeb_supervisor(http_async_client=http_async_client)
+
+@lru_cache(maxsize=1)
+def _get_scout_bee():
+    return create_scout_bee()
+
+def _is_conversation_message(msg) -> bool:
+    """Check whether a message is a user message or an assistant reply without tool calls."""
+    if isinstance(msg, HumanMessage):
+        return True
+    if isinstance(msg, AIMessage):
+        return not msg.tool_calls
+    if isinstance(msg, dict):
+        role = msg.get('role')
+        return role == 'user' or (role == 'assistant' and not msg.get('tool_calls'))
+    return False
+
+async def beeb_main_node(state: BargainBMemoryState, config: RunnableConfig):
     """
     Main Beeb supervisor node that coordinates all worker bees.
     
@@ -148,8 +203,9 @@ def beeb_main_node(state: BargainBMemoryState, config: RunnableConfig):
     """
     
     # Get the user ID from the config
-    user_id = config["configurable"].get("user_id", "default")
-    thread_id = config["configurable"].get("thread_id", "default")
+    configurable = config["configurable"]
+    user_id = configurable.get("user_id", "default")
+    thread_id = configurable.get("thread_id", "default")
     conversation_id = f"{user_id}_{thread_id}"
 
     # Load conversation summary from database (following external DB memory pattern)
@@ -160,57 +216,31 @@ def beeb_main_node(state: BargainBMemoryState, config: RunnableConfig):
             db_summary = get_conversation_summary(conversation_id)
             if db_summary:
                 summary = db_summary
-                print(f"📝 Beeb: Loaded conversation summary from database for {conversation_id}")
+                logger.debug("📝 Beeb: Loaded conversation summary from database for %s", conversation_id)
         except Exception as e:
-            print(f"❌ Beeb: Failed to load conversation summary: {e}")
-    
-    # For now, use empty memories for Trustcall system (separate from conversation summaries)
-    # TODO: Implement proper Trustcall memory loading when needed
-    semantic_memory = None
-    episodic_memories = []
-    procedural_memory = None
-    
-    # Initialize worker bee results as empty
-    scout_results = ""
-    memory_results = ""
-    scribe_results = ""
-    
-    # Check if we have previous worker bee results in the state
-    # (This would be populated by worker bee nodes)
-    scout_results = state.get("scout_results", "")
-    memory_results = state.get("memory_results", "")
-    scribe_results = state.get("scribe_results", "")
-
-    # Format memory context for Beeb
-    formatted_semantic = _format_semantic_memory(semantic_memory)
-    formatted_episodic = _format_episodic_memories(episodic_memories)
-    formatted_procedural = _format_procedural_memory(procedural_memory)
+            logger.error("❌ Beeb: Failed to load conversation summary: %s", e)
+    
+    # Worker bee results from this user turn (populated by worker bee nodes). A new
+    # user message starts a new turn, so results from earlier turns are dropped;
+    # delegation rounds within a turn keep adding to them
+    new_turn = isinstance(state["messages"][-1], HumanMessage)
+    if new_turn:
+        scout_results = memory_results = scribe_results = ""
+    else:
+        scout_results = state.get("scout_results") or ""
+        memory_results = state.get("memory_results") or ""
+        scribe_results = state.get("scribe_results") or ""
 
     # Filter messages to only include user and assistant messages without tool calls
     # This prevents OpenAI API errors about unresponded tool calls
-    clean_messages = []
-    for msg in state["messages"]:
-        if hasattr(msg, 'role'):
-            if msg.role == "user":
-                clean_messages.append(msg)
-            elif msg.role == "assistant" and not (hasattr(msg, 'tool_calls') and msg.tool_calls):
-                clean_messages.append(msg)
-        else:
-            # Handle message dict format
-            if isinstance(msg, dict):
-                if msg.get('role') == 'user':
-                    clean_messages.append(msg)
-                elif msg.get('role') == 'assistant' and not msg.get('tool_calls'):
-                    clean_messages.append(msg)
+    clean_messages = [msg for msg in state["messages"] if _is_conversation_message(msg)]
 
     # Create context for Beeb supervisor
     context = {
         "user_id": user_id,
         "thread_id": thread_id,
         "summary": summary,
-        "semantic_memory": formatted_semantic,
-        "episodic_memories": formatted_episodic,
-        "procedural_memory": formatted_procedural,
+        **EMPTY_MEMORY_CONTEXT,
         "scout_results": scout_results,
         "memory_results": memory_results,
         "scribe_results": scribe_results,
@@ -218,132 +248,149 @@ def beeb_main_node(state: BargainBMemoryState, config: RunnableConfig):
     }
 
     # Use Beeb supervisor to coordinate and respond
-    response = beeb_supervisor.invoke(context)
+    response = await _get_beeb_supervisor().ainvoke(context)
     
-    # Check if Beeb made tool calls for delegation
-    if hasattr(response, 'tool_calls') and response.tool_calls:
-        # Return the response with tool calls for routing
-        return {"messages": [response]}
-    else:
-        # Beeb responded directly without delegation
-        return {"messages": [response]}
+    # Tool calls in the response are routed to the bees by route_decisions.
+    # Clear the previous turn's results so this turn's bees start fresh
+    if new_turn:
+        return {"messages": [response], "scout_results": None, "memory_results": None, "scribe_results": None}
+    return {"messages": [response]}
 
-def scout_bee_node(state: BargainBMemoryState, config: RunnableConfig):
+def _tool_response(tool_call: dict, content) -> dict:
+    """Build the tool message answering one of Beeb's delegation tool calls."""
+    return {"role": "tool", "content": content, "tool_call_id": tool_call["id"]}
+
+async def scout_bee_node(state: dict, config: RunnableConfig):
     """
-    Scout Bee node for product search and price comparison.
+    Scout Bee node for a single product search delegation.
     
     This node:
-    - Receives product search tasks from Beeb
+    - Receives one assign_to_scout_bee tool call from Beeb via Send
     - Uses Scout Bee to search for products
     - Returns search results to Beeb
+    
+    Each search Beeb delegates runs in its own scout_bee_node instance.
     """
     
-    # Get the last message which should contain the search task
-    last_message = state["messages"][-1]
-    
-    # Check if this is a delegation to Scout Bee
-    if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
-        for tool_call in last_message.tool_calls:
-            if tool_call["name"] == "assign_to_scout_bee":
-                search_task = tool_call["args"]["task_description"]
-                
-                # Use Scout Bee to process the search
-                search_state = {"messages": [{"role": "user", "content": search_task}]}
-                result = scout_bee(search_state)
-                
-                # Extract the search results
-                search_results = result["messages"][-1]["content"]
-                
-                # Return tool response and update state with results
-                tool_response = {
-                    "role": "tool",
-                    "content": search_results,
-                    "tool_call_id": tool_call["id"]
-                }
-                
-                return {
-                    "messages": [tool_response],
-                    "scout_results": search_results
-                }
-    
-    return {"messages": []}
-
-def memory_bee_node(state: BargainBMemoryState, config: RunnableConfig):
+    tool_call = state["tool_call"]
+    search_task = tool_call["args"]["task_description"]
+    
+    try:
+        # Use Scout Bee to process the search (runs off the event loop)
+        search_state = {"messages": [{"role": "user", "content": search_task}]}
+        result = await asyncio.to_thread(_get_scout_bee(), search_state)
+        
+        # Extract the search results
+        search_results = result["messages"][-1]["content"]
+    except Exception as e:
+        logger.error("❌ Scout Bee: Search failed: %s", e)
+        return {"messages": [_tool_response(tool_call, f"Task failed: {e}")]}
+    
+    return {
+        "messages": [_tool_response(tool_call, search_results)],
+        "scout_results": search_results
+    }
+
+async def memory_bee_node(state: dict, config: RunnableConfig, store: BaseStore):
     """
-    Memory Bee node for memory management and updates.
+    Memory Bee node for all memory update delegations in one turn.
     
     This node:
-    - Receives memory update tasks from Beeb
-    - Uses Memory Bee and Trustcall to update memories
-    - Saves memories to the store
-    - Returns confirmation to Beeb
+    - Receives every assign_to_memory_bee tool call from Beeb via Send
+    - Updates profile and shopping memories with a single Trustcall pass when both are requested
+    - Updates instructions memory alongside
+    - Returns one confirmation per tool call to Beeb
     """
     
-    # Get the last message which should contain the memory task
-    last_message = state["messages"][-1]
-    
-    # Check if this is a delegation to Memory Bee
-    if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
-        for tool_call in last_message.tool_calls:
-            if tool_call["name"] == "assign_to_memory_bee":
-                memory_type = tool_call["args"]["memory_type"]
-                context = tool_call["args"]["context"]
-                
-                # Route to appropriate memory update based on type
-                if memory_type == "profile":
-                    result = update_profile_memory(state, config, store)
-                elif memory_type == "shopping":
-                    result = update_shopping_memory(state, config, store)
-                elif memory_type == "instructions":
-                    result = update_instructions_memory(state, config, store)
-                else:
-                    result = {"messages": [{"role": "tool", "content": f"Unknown memory type: {memory_type}", "tool_call_id": tool_call["id"]}]}
-                
-                # Add memory results to state
-                memory_results = f"Updated {memory_type} memory with: {context}"
-                result["memory_results"] = memory_results
-                
-                return result
-    
-    return {"messages": []}
-
-def scribe_bee_node(state: BargainBMemoryState, config: RunnableConfig):
+    tool_calls = state["tool_calls"]
+    
+    # The user message that started this turn, before Beeb's delegation rounds.
+    # When it is empty there is nothing new to learn from, so skip the LLM calls
+    user_turn = next((msg for msg in reversed(state["messages"]) if isinstance(msg, HumanMessage)), None)
+    if user_turn is None or not str(user_turn.content).strip():
+        return {"messages": [_tool_response(tool_call, "no changes") for tool_call in tool_calls]}
+    
+    memory_types = {tool_call["args"]["memory_type"] for tool_call in tool_calls}
+    
+    # Each memory type is extracted once from the conversation, however many calls asked for it
+    updates = {}
+    if memory_types & {"profile", "shopping"}:
+        # Merge the chat history and the instruction once for the Trustcall updates
+        updated_messages = _build_trustcall_messages(state)
+        if {"profile", "shopping"} <= memory_types:
+            updates["profile"] = updates["shopping"] = update_combined_memory(state, config, store, updated_messages)
+        elif "profile" in memory_types:
+            updates["profile"] = update_profile_memory(state, config, store, updated_messages)
+        else:
+            updates["shopping"] = update_shopping_memory(state, config, store, updated_messages)
+    if "instructions" in memory_types:
+        updates["instructions"] = update_instructions_memory(state, config, store)
+    
+    # Run the distinct updates concurrently and map results back to memory types,
+    # so one failed update does not hide the writes that already succeeded
+    distinct = list(dict.fromkeys(updates.values()))
+    outcomes = dict(zip(distinct, await asyncio.gather(*distinct, return_exceptions=True)))
+    contents = {}
+    failed = set()
+    for memory_type, update in updates.items():
+        outcome = outcomes[update]
+        if isinstance(outcome, Exception):
+            logger.error("❌ Memory Bee: %s update failed: %s", memory_type, outcome)
+            failed.add(memory_type)
+            outcome = f"Task failed: {outcome}"
+        contents[memory_type] = outcome
+    
+    messages = []
+    memory_results = []
+    for tool_call in tool_calls:
+        memory_type = tool_call["args"]["memory_type"]
+        content = contents.get(memory_type, f"Unknown memory type: {memory_type}")
+        messages.append(_tool_response(tool_call, content))
+        if memory_type not in failed:
+            memory_results.append(f"Updated {memory_type} memory with: {tool_call['args']['context']}")
+    
+    return {"messages": messages, "memory_results": "\n".join(memory_results)}
+
+async def scribe_bee_node(state: dict, config: RunnableConfig):
     """
-    Scribe Bee node for conversation summarization.
+    Scribe Bee node for the summarization delegations in one turn.
     
     This node:
-    - Receives summarization tasks from Beeb
-    - Uses Scribe Bee to summarize conversations
+    - Receives every assign_to_scribe_bee tool call from Beeb via Send
+    - Summarizes the conversation once and saves it to the database
     - Returns summarization results to Beeb
     """
     
-    # Get the last message which should contain the summarization task
-    last_message = state["messages"][-1]
-    
-    # Check if this is a delegation to Scribe Bee
-    if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
-        for tool_call in last_message.tool_calls:
-            if tool_call["name"] == "assign_to_scribe_bee":
-                # Use the summarization logic
-                result = summarize_conversation(state, config)
-                
-                # Return tool response with summarization results
-                tool_response = {
-                    "role": "tool",
-                    "content": f"Conversation summarized and saved to database: {result['summary'][:100]}...",
-                    "tool_call_id": tool_call["id"]
-                }
-                
-                return {
-                    "messages": [tool_response],
-                    "scribe_results": f"Summarized and saved conversation: {result['summary'][:100]}...",
-                    "summary": result["summary"]
-                }
-    
-    return {"messages": []}
+    tool_calls = state["tool_calls"]
+    
+    # Summarize the history without Beeb's delegation message: its tool calls
+    # have no responses yet, and OpenAI rejects unanswered tool calls
+    history = {"messages": state["messages"][:-1], "summary": state.get("summary")}
+    try:
+        result = await summarize_conversation(history, config)
+    except Exception as e:
+        logger.error("❌ Scribe Bee: Summarization failed: %s", e)
+        return {"messages": [_tool_response(tool_call, f"Task failed: {e}") for tool_call in tool_calls]}
+    
+    confirmation = f"Conversation summarized and saved to database: {result['summary'][:100]}..."
+    return {
+        "messages": [_tool_response(tool_call, confirmation) for tool_call in tool_calls],
+        "scribe_results": f"Summarized and saved conversation: {result['summary'][:100]}...",
+        "summary": result["summary"]
+    }
 
 # Memory management functions (adapted from mem.md patterns)
-def update_profile_memory(state: BargainBMemoryState, config: RunnableConfig):
+def _build_trustcall_messages(state: BargainBMemoryState) -> list:
+    """Merge the Trustcall instruction with the chat history, excluding Beeb's delegation message."""
+    TRUSTCALL_INSTRUCTION_FORMATTED = TRUSTCALL_INSTRUCTION.format(time=current_time_bucket())
+    messages = [SystemMessage(content=TRUSTCALL_INSTRUCTION_FORMATTED)] + state["messages"][:-1]
+    
+    # Chat history usually alternates message types already, leaving nothing to merge
+    if all(type(prev) is not type(msg) for prev, msg in zip(messages, messages[1:])):
+        return messages
+    return list(merge_message_runs(messages=messages))
+
+async def update_profile_memory(state: BargainBMemoryState, config: RunnableConfig, store: BaseStore, updated_messages: list) -> str:
     """Update user profile memory using Trustcall (like update_profile in mem.md)."""
     
     # Get the user ID from the config
@@ -353,7 +400,7 @@ def update_profile_memory(state: BargainBMemoryState, config: RunnableConfig):
     namespace = ("profile", user_id)
 
     # Retrieve the most recent memories for context
-    existing_items = store.search(namespace)
+    existing_items = await store.asearch(namespace, limit=MEMORY_SEARCH_LIMIT)
 
     # Format the existing memories for the Trustcall extractor
     tool_name = "UserProfile"
@@ -362,33 +409,21 @@ def update_profile_memory(state: BargainBMemoryState, config: RunnableConfig):
                           if existing_items
                           else None)
 
-    # Merge the chat history and the instruction
-    TRUSTCALL_INSTRUCTION_FORMATTED = TRUSTCALL_INSTRUCTION.format(time=datetime.now().isoformat())
-    updated_messages = list(merge_message_runs(messages=[SystemMessage(content=TRUSTCALL_INSTRUCTION_FORMATTED)] + state["messages"][:-1]))
+    # Invoke the shared extractor
+    profile_extractor = _get_extractor(UserProfile)
+    result = await profile_extractor.ainvoke({"messages": updated_messages, 
+                                            "existing": existing_memories})
 
-    # Create the extractor
-    profile_extractor = create_extractor(
-        model,
-        tools=[UserProfile],
-        tool_choice="UserProfile",
-        enable_inserts=True
-    )
-
-    # Invoke the extractor
-    result = profile_extractor.invoke({"messages": updated_messages, 
-                                     "existing": existing_memories})
-
-    # Save the memories from Trustcall to the store
-    for r, rmeta in zip(result["responses"], result["response_metadata"]):
-        store.put(namespace,
-                  rmeta.get("json_doc_id", str(uuid.uuid4())),
-                  r.model_dump(mode="json"))
+    # Save the memories from Trustcall to the store in one batch
+    await store.abatch([
+        PutOp(namespace, rmeta.get("json_doc_id") or str(uuid.uuid4()), r.model_dump(mode="json"))
+        for r, rmeta in zip(result["responses"], result["response_metadata"])
+    ])
     
-    # Return tool response
-    tool_calls = state['messages'][-1].tool_calls
-    return {"messages": [{"role": "tool", "content": "updated profile", "tool_call_id": tool_calls[0]['id']}]}
+    # Return tool response content
+    return "updated profile"
 
-def update_shopping_memory(state: BargainBMemoryState, config: RunnableConfig):
+async def update_shopping_memory(state: BargainBMemoryState, config: RunnableConfig, store: BaseStore, updated_messages: list) -> str:
     """Update shopping history memory using Trustcall (like update_todos in mem.md)."""
     
     # Get the user ID from the config
@@ -398,7 +433,7 @@ def update_shopping_memory(state: BargainBMemoryState, config: RunnableConfig):
     namespace = ("shopping", user_id)
 
     # Retrieve the most recent memories for context
-    existing_items = store.search(namespace)
+    existing_items = await store.asearch(namespace, limit=MEMORY_SEARCH_LIMIT)
 
     # Format the existing memories for the Trustcall extractor
     tool_name = "ShoppingMemory"
@@ -407,38 +442,57 @@ def update_shopping_memory(state: BargainBMemoryState, config: RunnableConfig):
                           if existing_items
                           else None)
 
-    # Merge the chat history and the instruction
-    TRUSTCALL_INSTRUCTION_FORMATTED = TRUSTCALL_INSTRUCTION.format(time=datetime.now().isoformat())
-    updated_messages = list(merge_message_runs(messages=[SystemMessage(content=TRUSTCALL_INSTRUCTION_FORMATTED)] + state["messages"][:-1]))
-
     # Initialize the spy for visibility into the tool calls made by Trustcall
     spy = Spy()
     
-    # Create the Trustcall extractor
-    shopping_extractor = create_extractor(
-        model,
-        tools=[ShoppingMemory],
-        tool_choice=tool_name,
-        enable_inserts=True
-    ).with_listeners(on_end=spy)
+    # Attach the spy to the shared Trustcall extractor
+    shopping_extractor = _get_extractor(ShoppingMemory).with_listeners(on_end=spy)
 
     # Invoke the extractor
-    result = shopping_extractor.invoke({"messages": updated_messages, 
-                                      "existing": existing_memories})
-
-    # Save the memories from Trustcall to the store
-    for r, rmeta in zip(result["responses"], result["response_metadata"]):
-        store.put(namespace,
-                  rmeta.get("json_doc_id", str(uuid.uuid4())),
-                  r.model_dump(mode="json"))
+    result = await shopping_extractor.ainvoke({"messages": updated_messages, 
+                                             "existing": existing_memories})
+
+    # Save the memories from Trustcall to the store in one batch
+    await store.abatch([
+        PutOp(namespace, rmeta.get("json_doc_id") or str(uuid.uuid4()), r.model_dump(mode="json"))
+        for r, rmeta in zip(result["responses"], result["response_metadata"])
+    ])
         
     # Respond to the tool call with visibility into changes
-    tool_calls = state['messages'][-1].tool_calls
-    shopping_update_msg = extract_tool_info(spy.called_tools, tool_name)
+    return extract_tool_info(spy.called_tools, tool_name)
+
+async def update_combined_memory(state: BargainBMemoryState, config: RunnableConfig, store: BaseStore, updated_messages: list) -> str:
+    """Update profile and shopping memories with one Trustcall pass using parallel tool calls."""
+    
+    # Get the user ID from the config
+    user_id = config["configurable"]["user_id"]
     
-    return {"messages": [{"role": "tool", "content": shopping_update_msg, "tool_call_id": tool_calls[0]['id']}]}
+    # Each schema keeps its own namespace in the store
+    namespaces = {
+        "UserProfile": ("profile", user_id),
+        "ShoppingMemory": ("shopping", user_id),
+    }
+    
+    # Retrieve existing memories for both schemas
+    existing_items = await asyncio.gather(*(store.asearch(namespace, limit=MEMORY_SEARCH_LIMIT) for namespace in namespaces.values()))
+    existing_memories = [(existing_item.key, tool_name, existing_item.value)
+                         for tool_name, items in zip(namespaces, existing_items)
+                         for existing_item in items] or None
+    
+    # Invoke the extractor once; the model emits both schemas in parallel
+    combined_extractor = _get_extractor(UserProfile, ShoppingMemory)
+    result = await combined_extractor.ainvoke({"messages": updated_messages,
+                                               "existing": existing_memories})
+    
+    # Save each memory to the namespace of its schema in one batch
+    await store.abatch([
+        PutOp(namespaces[type(r).__name__], rmeta.get("json_doc_id") or str(uuid.uuid4()), r.model_dump(mode="json"))
+        for r, rmeta in zip(result["responses"], result["response_metadata"])
+    ])
+    
+    return "updated profile and shopping"
 
-def update_instructions_memory(state: BargainBMemoryState, config: RunnableConfig):
+async def update_instructions_memory(state: BargainBMemoryState, config: RunnableConfig, store: BaseStore) -> str:
     """Update instructions memory (like update_instructions in mem.md)."""
     
     # Get the user ID from the config
@@ -446,25 +500,28 @@ def update_instructions_memory(state: BargainBMemoryState, config: RunnableConfi
     
     namespace = ("instructions", user_id)
 
-    existing_memory = store.get(namespace, "user_instructions")
+    existing_memory = await store.aget(namespace, "user_instructions")
         
     # Format the memory in the system prompt
     system_msg = CREATE_INSTRUCTIONS.format(
         current_instructions=existing_memory.value if existing_memory else None
     )
     
-    new_memory = model.invoke([SystemMessage(content=system_msg)] + state['messages'][:-1] + 
-                            [HumanMessage(content="Please update the instructions based on the conversation")])
+    # Behavioral preferences come from the recent exchange; the current
+    # instructions already carry everything learned before it
+    recent_messages = [msg for msg in state['messages'][:-1] if _is_conversation_message(msg)][-INSTRUCTIONS_CONTEXT_MESSAGES:]
+    
+    new_memory = await instructions_model.ainvoke([SystemMessage(content=system_msg)] + recent_messages + 
+                                                  [HumanMessage(content="Please update the instructions based on the conversation")])
 
     # Overwrite the existing memory in the store 
     key = "user_instructions"
-    store.put(namespace, key, {"memory": new_memory.content})
+    await store.aput(namespace, key, {"memory": new_memory.content})
     
-    tool_calls = state['messages'][-1].tool_calls
-    return {"messages": [{"role": "tool", "content": "updated instructions", "tool_call_id": tool_calls[0]['id']}]}
+    return "updated instructions"
 
 # Conversation summarization function following the document pattern
-def summarize_conversation(state: BargainBMemoryState, config: RunnableConfig):
+async def summarize_conversation(state: BargainBMemoryState, config: RunnableConfig):
     """
     Summarize the conversation and truncate messages following the external DB memory pattern.
     
@@ -486,16 +543,14 @@ def summarize_conversation(state: BargainBMemoryState, config: RunnableConfig):
     # Create our summarization prompt
     if summary:
         # A summary already exists - extend it
-        summary_message = (
-            f"This is summary of the conversation to date: {summary}\n\n"
-            "Extend the summary by taking into account the new messages above:"
-        )
+        summary_message = EXTEND_SUMMARY_PROMPT.format(summary=summary)
     else:
-        summary_message = "Create a summary of the conversation above:"
+        summary_message = CREATE_SUMMARY_PROMPT
     
     # Add prompt to our history
     messages = state["messages"] + [HumanMessage(content=summary_message)]
-    response = model.invoke(messages)
+    response = await model.ainvoke(messages)
+    tokens_used = (getattr(response, 'usage_metadata', None) or {}).get('total_tokens', 0)
     
     # Save the conversation summary to database
     try:
@@ -504,61 +559,140 @@ def summarize_conversation(state: BargainBMemoryState, config: RunnableConfig):
             thread_id=thread_id,
             summary_text=response.content,
             message_count=len(state["messages"]),
-            tokens_used=getattr(response, 'usage_metadata', {}).get('total_tokens', 0)
+            tokens_used=tokens_used
         )
-        print(f"📝 Scribe Bee: Saved conversation summary to database for {conversation_id}")
+        logger.debug("📝 Scribe Bee: Saved conversation summary to database for %s", conversation_id)
     except Exception as e:
-        print(f"❌ Scribe Bee: Failed to save conversation summary: {e}")
+        logger.error("❌ Scribe Bee: Failed to save conversation summary: %s", e)
     
-    # Delete all but the 2 most recent messages (following external DB pattern)
-    delete_messages = [RemoveMessage(id=m.id) for m in state["messages"][:-2]]
+    # Delete all but the most recent messages (following external DB pattern). The
+    # kept messages never start with a tool response whose tool call is deleted,
+    # since OpenAI rejects tool messages without a preceding tool call
+    history = state["messages"]
+    cut = max(len(history) - SUMMARY_KEEP_MESSAGES, 0)
+    while cut < len(history) and isinstance(history[cut], ToolMessage):
+        cut += 1
+    delete_messages = [RemoveMessage(id=history[i].id) for i in range(cut)]
     
     # Log the truncation event to database
     try:
         log_truncation_db(
             conversation_id=conversation_id,
             thread_id=thread_id,
-            messages_before=len(state["messages"]),
-            messages_after=2,  # Keep only 2 most recent
+            messages_before=len(history),
+            messages_after=len(history) - cut,
             messages_removed=len(delete_messages),
-            summary_tokens=getattr(response, 'usage_metadata', {}).get('total_tokens', 0)
+            summary_tokens=tokens_used
         )
-        print(f"📝 Scribe Bee: Logged message truncation for {conversation_id}")
+        logger.debug("📝 Scribe Bee: Logged message truncation for %s", conversation_id)
     except Exception as e:
-        print(f"❌ Scribe Bee: Failed to log message truncation: {e}")
+        logger.error("❌ Scribe Bee: Failed to log message truncation: %s", e)
     
     return {"summary": response.content, "messages": delete_messages}
 
-def route_decisions(state: BargainBMemoryState, config: RunnableConfig) -> Literal[END, "scout_bee_node", "memory_bee_node", "scribe_bee_node", "summarize_conversation"]:
+# Tokenizer for the gpt-4o model family. tiktoken downloads it the first time,
+# so it is loaded in a background thread from import on and never on the event
+# loop; until it is ready, token counts are estimated from message length.
+# A failed load is retried at most every TOKENIZER_RETRY_SECONDS
+TOKENIZER_RETRY_SECONDS = 300
+_encoding = None
+_encoding_loader = None
+_encoding_attempted_at = 0.0
+_encoding_lock = threading.Lock()
+
+def _load_encoding():
+    global _encoding
+    try:
+        _encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("⚠️ Tokenizer unavailable, estimating token counts from length: %s", e)
+
+def _warm_encoding():
+    """Start loading the tokenizer in the background unless it is loaded, loading or recently failed."""
+    global _encoding_loader, _encoding_attempted_at
+    with _encoding_lock:
+        if _encoding is not None or (_encoding_loader is not None and _encoding_loader.is_alive()):
+            return
+        now = time.monotonic()
+        if _encoding_loader is not None and now - _encoding_attempted_at < TOKENIZER_RETRY_SECONDS:
+            return
+        _encoding_attempted_at = now
+        _encoding_loader = threading.Thread(target=_load_encoding, name="tokenizer-warmup", daemon=True)
+        _encoding_loader.start()
+
+_warm_encoding()
+
+@lru_cache(maxsize=4096)
+def _encoded_length(text: str) -> int:
+    """Count the tokens in a message body; repeated messages are counted once."""
+    return len(_encoding.encode(text, disallowed_special=()))
+
+def _count_tokens(text: str) -> int:
+    """Count the tokens in a message body, estimating while the tokenizer is not loaded."""
+    if _encoding is None:
+        _warm_encoding()
+        return len(text) // 4
+    return _encoded_length(text)
+
+def _approx_tokens(messages: list) -> int:
+    """Approximate the prompt size of the conversation history in tokens."""
+    return sum(_count_tokens(str(msg.content)) for msg in messages)
+
+# Bee node each of Beeb's delegation tools routes to. Scout Bee gets one node
+# per search; Memory and Scribe Bee get one node for all their calls in a turn
+BEE_NODES = {
+    "assign_to_scout_bee": "scout_bee_node",
+    "assign_to_memory_bee": "memory_bee_node",
+    "assign_to_scribe_bee": "scribe_bee_node",
+}
+
+def route_decisions(state: BargainBMemoryState, config: RunnableConfig) -> Union[Literal[END, "summarize_conversation"], List[Send]]:
     """
     Route decisions based on Beeb's tool calls and message count.
     
     This function:
-    1. First checks if summarization is needed (message count > 10)
-    2. Then checks for bee delegation based on tool calls
-    3. Otherwise ends the conversation
+    1. Fans out one scout_bee_node per product search via Send
+    2. Sends the memory and scribe delegations to their bees alongside the searches
+    3. Once Beeb has replied, checks if summarization is needed (message count >
+       SUMMARIZATION_THRESHOLD or history tokens > SUMMARIZATION_TOKEN_THRESHOLD)
+    4. Otherwise ends the conversation
     """
     
-    # First, check if summarization is needed following document pattern
+    # Check the last AI message for tool calls (bee delegation)
     messages = state["messages"]
-    if len(messages) > 10:
+    tool_calls = getattr(messages[-1], 'tool_calls', None) or ()
+    
+    # Summarize only after Beeb's final reply, so pending delegations always run,
+    # and never when the history is already down to what summarization keeps
+    if (
+        not tool_calls
+        and len(messages) > SUMMARY_KEEP_MESSAGES
+        and (len(messages) > SUMMARIZATION_THRESHOLD or _approx_tokens(messages) > SUMMARIZATION_TOKEN_THRESHOLD)
+    ):
         return "summarize_conversation"
     
-    # Check the last AI message for tool calls (bee delegation)
-    last_message = state["messages"][-1]
-    
-    if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
-        for tool_call in last_message.tool_calls:
-            if tool_call["name"] == "assign_to_scout_bee":
-                return "scout_bee_node"
-            elif tool_call["name"] == "assign_to_memory_bee":
-                return "memory_bee_node"
-            elif tool_call["name"] == "assign_to_scribe_bee":
-                return "scribe_bee_node"
+    routes = []
+    batched = {}
+    for tool_call in tool_calls:
+        node = BEE_NODES.get(tool_call["name"])
+        if node == "scout_bee_node":
+            routes.append(Send(node, {"tool_call": tool_call}))
+        elif node:
+            batched.setdefault(node, []).append(tool_call)
+    
+    # Memory delegations share one Memory Bee so their extraction can be combined,
+    # and Scribe delegations share one so the conversation is summarized once.
+    # Each bee is sent only the state keys it reads
+    for node, node_calls in batched.items():
+        payload = {"messages": messages, "tool_calls": node_calls}
+        if node == "scribe_bee_node":
+            payload["summary"] = state.get("summary")
+        routes.append(Send(node, payload))
     
     # If no tool calls or summarization needed, end the conversation
-    return END
+    return routes or END
 
+@lru_cache(maxsize=1)
 def create_bargainb_memory_agent():
     """
     Create the BargainB memory agent with bee delegation system.
@@ -570,6 +704,9 @@ def create_bargainb_memory_agent():
     - Conversation summarization
     - Database integration for products and memory
     - LangGraph platform built-in persistence
+    
+    The compiled graph is stateless between runs, so it is built once and
+    the same instance is returned on every call.
     """
     
     # Create the graph with bee delegation system
@@ -584,7 +721,9 @@ def create_bargainb_memory_agent():
     
     # Define the flow - start with Beeb, then route based on decisions
     builder.add_edge(START, "beeb_main_node")
-    builder.add_conditional_edges("beeb_main_node", route_decisions)
+    builder.add_conditional_edges(
+        "beeb_main_node", route_decisions, [*BEE_NODES.values(), "summarize_conversation", END]
+    )
     
     # Worker bees return to Beeb for coordination
     builder.add_edge("scout_bee_node", "beeb_main_node")
@@ -604,5 +743,6 @@ def create_bargainb_memory_agent_legacy():
     """Legacy function - use create_bargainb_memory_agent() instead."""
     return create_bargainb_memory_agent()
 
-# Export the graph instance for LangGraph deployment
-memory_agent = create_bargainb_memory_agent() 
\ No newline at end of file
+# Export the graph instance for LangGraph deployment. The server loader reads it
+# straight from the module namespace, so it must be a real module attribute
+memory_agent = create_bargainb_memory_agent()
@@ -10,6 +10,7 @@ Beeb always responds to users and delegates tasks to specialized worker bees
 while maintaining conversation continuity and memory context.
 """
 
+import os
 from typing import Annotated, List, Optional, Dict, Any
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.tools import tool
@@ -74,7 +75,12 @@ def assign_to_scribe_bee() -> str:
     return "Summarization task assigned to Scribe Bee 🐝📝"
 
 
-def create_beeb_supervisor():
+def current_time_bucket() -> str:
+    """Current time truncated to the minute, so prompts stay identical within a minute."""
+    return datetime.now().replace(second=0, microsecond=0).isoformat()
+
+
+def create_beeb_supervisor(http_async_client=None):
     """
     Create Beeb, the Queen Bee supervisor who coordinates all worker bees.
     
@@ -85,10 +91,15 @@ def create_beeb_supervisor():
     - Maintaining conversation continuity and memory context
     - Making decisions about when to delegate vs. handle directly
     
+    Args:
+        http_async_client: Optional shared httpx.AsyncClient for OpenAI calls
+        
     Returns:
         Configured ChatOpenAI model with delegation tools
     """
     
+    # Static instructions come first so the prompt prefix stays identical across
+    # turns (and cacheable by OpenAI); per-turn context follows in its own message
     beeb_prompt = ChatPromptTemplate.from_messages([
         (
             "system",
@@ -123,6 +134,21 @@ def create_beeb_supervisor():
             "- The conversation has more than 8 messages\n"
             "- Context is getting too long to manage effectively\n\n"
             
+            "**Parallel Delegation**: When a message needs several worker bees (for example a product search "
+            "and a memory update), call all of their tools in the same response so they work at the same time\n\n"
+            
+            "## Response Guidelines ##\n"
+            "- Always respond as Beeb in first person\n"
+            "- Be conversational and helpful\n"
+            "- Show price-conscious awareness when relevant\n"
+            "- Use memory context to personalize responses\n"
+            "- If you have results from worker bees, use them in your response instead of delegating again\n"
+            "- Never mention the worker bees to users - seamlessly integrate results\n"
+            "- Ask follow-up questions to better understand user needs\n"
+            "- Only delegate to worker bees if you need NEW information that isn't already available in the results\n"
+        ),
+        (
+            "system",
             "## User Memory Context ##\n"
             "Current User: {user_id}\n"
             "Thread: {thread_id}\n"
@@ -147,32 +173,22 @@ def create_beeb_supervisor():
             "**Scribe Bee 🐝📝 Results:**\n"
             "{scribe_results}\n\n"
             
-            "## Response Guidelines ##\n"
-            "- Always respond as Beeb in first person\n"
-            "- Be conversational and helpful\n"
-            "- Show price-conscious awareness when relevant\n"
-            "- Use memory context to personalize responses\n"
-            "- If you have results from worker bees, use them in your response instead of delegating again\n"
-            "- Never mention the worker bees to users - seamlessly integrate results\n"
-            "- Ask follow-up questions to better understand user needs\n"
-            "- Only delegate to worker bees if you need NEW information that isn't already available in the results\n\n"
-            
             "Current Time: {time}\n"
         ),
         ("placeholder", "{messages}")
     ]).partial(
-        time=datetime.now().isoformat()
+        time=current_time_bucket
     )
     
-    # Create the LLM with delegation tools
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
+    # Create the LLM with delegation tools (model override with BB_CHAT_MODEL)
+    llm = ChatOpenAI(model=os.getenv("BB_CHAT_MODEL", "gpt-4o-mini"), temperature=0.7, max_retries=2, http_async_client=http_async_client)
     
-    # Bind delegation tools to Beeb
+    # Bind delegation tools to Beeb; parallel calls are fanned out by the graph
     beeb_with_tools = beeb_prompt | llm.bind_tools([
         assign_to_scout_bee,
         assign_to_memory_bee, 
         assign_to_scribe_bee
-    ])
+    ], parallel_tool_calls=True)
     
     return beeb_with_tools
 
@@ -25,9 +25,11 @@ def save_conversation_summary(
     tokens_used: int = 0
 ) -> str:
     """Save a conversation summary (in-memory for now, would be Supabase in production)."""
-    print(f"📝 [DB] Saving conversation summary for {conversation_id} (thread: {thread_id})")
-    print(f"    📊 Summary: {summary_text[:100]}...")
-    print(f"    📊 Message count: {message_count}, Tokens: {tokens_used}")
+    print(
+        f"📝 [DB] Saving conversation summary for {conversation_id} (thread: {thread_id})\n"
+        f"    📊 Summary: {summary_text[:100]}...\n"
+        f"    📊 Message count: {message_count}, Tokens: {tokens_used}"
+    )
     
     # Store in memory (would be Supabase in production)
     if conversation_id not in conversation_summaries:
@@ -62,8 +64,10 @@ def log_message_truncation(
     summary_tokens: int = 0
 ) -> None:
     """Log message truncation event (in-memory for now)."""
-    print(f"✂️ [DB] Logging message truncation for {conversation_id}")
-    print(f"    📊 Before: {messages_before}, After: {messages_after}, Removed: {messages_removed}")
+    print(
+        f"✂️ [DB] Logging message truncation for {conversation_id}\n"
+        f"    📊 Before: {messages_before}, After: {messages_after}, Removed: {messages_removed}"
+    )
     
     truncation_logs.append({
         'conversation_id': conversation_id,
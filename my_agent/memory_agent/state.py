@@ -8,6 +8,15 @@ from typing import TypedDict, List, Optional, Dict, Any, Literal, Annotated
 from langgraph.graph import MessagesState
 
 
+def merge_bee_results(existing: Optional[str], new: Optional[str]) -> Optional[str]:
+    """Join results from bee runs in the same user turn; writing None starts a new turn and "" adds nothing."""
+    if new is None:
+        return None
+    if not new:
+        return existing
+    return f"{existing}\n\n{new}" if existing else new
+
+
 class BargainBMemoryState(MessagesState):
     """
     Simplified state for BargainB memory agent following mem.md patterns.
@@ -30,6 +39,12 @@ class BargainBMemoryState(MessagesState):
     # Conversation summarization (optional feature)
     summary: Optional[str] = None
     
+    # Worker bee results (populated by the bee nodes for Beeb); bees append to
+    # each other across the delegation rounds of one user turn
+    scout_results: Annotated[Optional[str], merge_bee_results] = None
+    memory_results: Annotated[Optional[str], merge_bee_results] = None
+    scribe_results: Annotated[Optional[str], merge_bee_results] = None
+    
     # Product search context (for Scout Bee compatibility)
     products_discussed: List[str] = []
     price_sensitivity_detected: Optional[str] = None 
\ No newline at end of file
@@ -4,28 +4,98 @@ Database connection utilities for BargainB product database on Supabase.
 
 import os
 import asyncio
-from typing import List, Dict, Any, Optional
-import asyncpg
+import concurrent.futures
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional, Mapping
 from langchain_core.documents import Document
 from urllib.parse import urlparse
 from datetime import datetime
 
+
+@lru_cache(maxsize=1)
+def _snapshot_env() -> Mapping[str, Optional[str]]:
+    """Read the Supabase credentials from the environment once per process."""
+    env = os.environ
+    return MappingProxyType({
+        key: env.get(key)
+        for key in ('SUPABASE_URL', 'SUPABASE_SERVICE_ROLE_KEY', 'DB_PASSWORD')
+    })
+
+
+# Connection pool sizing; Supabase's pooler sits in front, so keep this modest
+POOL_MIN_SIZE = 5
+POOL_MAX_SIZE = 20
+POOL_MAX_INACTIVE_LIFETIME = 300  # seconds
+
+# After a failed connect, calls use mock data until this delay has passed and
+# then try again, so a transient Supabase error doesn't disable the database
+CONNECT_RETRY_DELAY = 30  # seconds
+
+# Product search results are cached per normalized query for a few minutes;
+# prices change slowly and the same searches repeat across conversations
+SEARCH_CACHE_SIZE = 1024
+SEARCH_CACHE_TTL = 300  # seconds
+_search_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_search_cache_lock = threading.Lock()
+
+
+def _search_cache_get(key: tuple) -> Optional[List[Document]]:
+    """Return the cached search results for key, or None when missing or expired."""
+    with _search_cache_lock:
+        entry = _search_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, documents = entry
+        if expires_at < time.monotonic():
+            del _search_cache[key]
+            return None
+        _search_cache.move_to_end(key)
+        return list(documents)
+
+
+def _search_cache_put(key: tuple, documents: List[Document]) -> None:
+    """Cache search results for key, evicting the least recently used entries."""
+    with _search_cache_lock:
+        _search_cache[key] = (time.monotonic() + SEARCH_CACHE_TTL, list(documents))
+        _search_cache.move_to_end(key)
+        while len(_search_cache) > SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+
+
+# Query words that ask for product details rather than just prices
+DESCRIPTION_KEYWORDS = (
+    'describe', 'description', 'about', 'what is', 'ingredients',
+    'nutrition', 'details', 'info', 'tell me about'
+)
+
+
 class BargainBDatabase:
     """Database connection and query utility for BargainB on Supabase."""
     
     def __init__(self):
-        self.connection = None
+        self.pool = None
+        # Created on first connect so it belongs to the loop running the queries
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._retry_at = 0.0
         
         # Get Supabase credentials from environment
-        supabase_url = os.getenv('SUPABASE_URL')
-        supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        db_password = os.getenv('DB_PASSWORD')
+        env = _snapshot_env()
+        supabase_url = env['SUPABASE_URL']
+        supabase_key = env['SUPABASE_SERVICE_ROLE_KEY']
+        db_password = env['DB_PASSWORD']
         
         # Check if we have the required environment variables
         if not supabase_url or not supabase_key:
-            print("⚠️  Database credentials not found in environment variables")
-            print("   SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY are required")
-            print("   Falling back to mock data mode")
+            print(
+                "⚠️  Database credentials not found in environment variables\n"
+                "   SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY are required\n"
+                "   Falling back to mock data mode"
+            )
             self.connection_params = None
             return
         
@@ -55,35 +125,58 @@ class BargainBDatabase:
             self.connection_params = None
     
     async def connect(self):
-        """Establish database connection to Supabase."""
+        """
+        Create the connection pool to Supabase.
+        
+        Concurrent first queries all land here; the lock makes sure only one
+        of them creates the pool and the rest reuse it.
+        """
         if not self.connection_params:
             print("⚠️  Database connection not available - using mock data")
             return
-            
-        if not self.connection:
+        
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        
+        async with self._connect_lock:
+            if self.pool:
+                return
+            if time.monotonic() < self._retry_at:
+                raise ConnectionError("Supabase connection failed recently, retrying later")
             try:
                 # Add statement_cache_size=0 for pgbouncer compatibility
                 conn_params = self.connection_params.copy()
                 conn_params['statement_cache_size'] = 0
                 
-                self.connection = await asyncpg.connect(**conn_params)
+                # Imported lazily so the agent graph can load without paying for
+                # (or requiring) the driver until a query actually runs
+                import asyncpg
+                
+                self.pool = await asyncpg.create_pool(
+                    min_size=POOL_MIN_SIZE,
+                    max_size=POOL_MAX_SIZE,
+                    max_inactive_connection_lifetime=POOL_MAX_INACTIVE_LIFETIME,
+                    **conn_params
+                )
                 print("✅ Connected to BargainB database on Supabase")
             except Exception as e:
-                print(f"❌ Supabase database connection failed: {e}")
-                print("Connection parameters:")
-                print(f"  Host: {self.connection_params['host']}")
-                print(f"  Port: {self.connection_params['port']}")
-                print(f"  Database: {self.connection_params['database']}")
-                print(f"  User: {self.connection_params['user']}")
-                print("  Falling back to mock data mode")
-                self.connection_params = None  # Disable future connection attempts
+                print(
+                    f"❌ Supabase database connection failed: {e}\n"
+                    "Connection parameters:\n"
+                    f"  Host: {self.connection_params['host']}\n"
+                    f"  Port: {self.connection_params['port']}\n"
+                    f"  Database: {self.connection_params['database']}\n"
+                    f"  User: {self.connection_params['user']}\n"
+                    f"  Falling back to mock data, retrying in {CONNECT_RETRY_DELAY}s"
+                )
+                self._retry_at = time.monotonic() + CONNECT_RETRY_DELAY
                 raise
     
     async def disconnect(self):
-        """Close database connection."""
-        if self.connection:
-            await self.connection.close()
-            self.connection = None
+        """Close the connection pool."""
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
     
     async def semantic_product_search(self, query: str, threshold: float = 0.1, limit: int = 10) -> List[Document]:
         """
@@ -97,7 +190,12 @@ class BargainBDatabase:
         Returns:
             List of Document objects with product information
         """
-        if not self.connection:
+        cache_key = (query.strip().lower(), threshold, limit)
+        cached = _search_cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
+        if not self.pool:
             await self.connect()
         
         try:
@@ -154,12 +252,14 @@ class BargainBDatabase:
             ORDER BY bd.search_rank;
             """
             
-            rows = await self.connection.fetch(sql, query, threshold, limit)
+            rows = await self.pool.fetch(sql, query, threshold, limit)
+            
+            # Check once whether the query asks for description/details
+            query_lower = query.lower()
+            include_description = any(word in query_lower for word in DESCRIPTION_KEYWORDS)
             
             documents = []
             for row in rows:
-                import json
-                
                 # Parse JSON safely
                 store_prices = []
                 if row['store_prices']:
@@ -199,12 +299,6 @@ class BargainBDatabase:
                 if best_price == float('inf'):
                     continue  # Skip if no valid prices found
                 
-                # Check if query asks for description/details
-                include_description = any(word in query.lower() for word in [
-                    'describe', 'description', 'about', 'what is', 'ingredients', 
-                    'nutrition', 'details', 'info', 'tell me about'
-                ])
-                
                 # Create focused price-comparison content
                 content_parts = [
                     f"Product: {row['title']}",
@@ -240,6 +334,7 @@ class BargainBDatabase:
                 documents.append(Document(page_content=content, metadata=metadata))
             
             print(f"💰 Retrieved {len(documents)} products with pricing comparison")
+            _search_cache_put(cache_key, documents)
             return documents
             
         except Exception as e:
@@ -257,7 +352,7 @@ class BargainBDatabase:
         Returns:
             List of Document objects with product information
         """
-        if not self.connection:
+        if not self.pool:
             await self.connect()
         
         try:
@@ -266,11 +361,10 @@ class BargainBDatabase:
             SELECT product_data FROM get_llm_products_by_category($1, $2);
             """
             
-            rows = await self.connection.fetch(sql, category, limit)
+            rows = await self.pool.fetch(sql, category, limit)
             
             documents = []
             for row in rows:
-                import json
                 product_data = json.loads(row['product_data'])  # Parse JSON string
                 
                 # Extract data from the JSON object
@@ -328,7 +422,7 @@ Product Description: {llm_search_text}
         Returns:
             List of Document objects with product information
         """
-        if not self.connection:
+        if not self.pool:
             await self.connect()
         
         try:
@@ -340,7 +434,7 @@ Product Description: {llm_search_text}
             FROM smart_grocery_search($1, $2, $3);
             """
             
-            rows = await self.connection.fetch(sql, query, budget, store)
+            rows = await self.pool.fetch(sql, query, budget, store)
             
             documents = []
             for row in rows:
@@ -358,7 +452,7 @@ Product Description: {llm_search_text}
                 WHERE p.id = $1
                 """
                 
-                product_details = await self.connection.fetchrow(product_details_sql, row['product_id'])
+                product_details = await self.pool.fetchrow(product_details_sql, row['product_id'])
                 
                 content = f"""
 Product: {row['title']}
@@ -420,6 +514,37 @@ Nutrition: Energy: {product_details['energy_kcal'] or 'N/A'} kcal, Protein: {pro
 # Global database instance
 db = BargainBDatabase()
 
+# Long-lived event loop for the synchronous wrappers below. Running every query
+# on the same loop lets the connection pool survive between calls, and works
+# the same whether or not the caller already has an event loop running.
+DB_CALL_TIMEOUT = 30  # seconds
+_db_loop: Optional[asyncio.AbstractEventLoop] = None
+_db_loop_lock = threading.Lock()
+
+
+def _get_db_loop() -> asyncio.AbstractEventLoop:
+    """Return the database event loop, starting its thread on first use."""
+    global _db_loop
+    with _db_loop_lock:
+        if _db_loop is None:
+            _db_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_db_loop.run_forever,
+                name="bargainb-db-loop",
+                daemon=True
+            ).start()
+        return _db_loop
+
+
+def _run_db_coroutine(coro, timeout: float = DB_CALL_TIMEOUT):
+    """Run a coroutine on the database event loop and wait for its result."""
+    future = asyncio.run_coroutine_threadsafe(coro, _get_db_loop())
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
 
 def semantic_search(query: str, limit: int = 10) -> List[dict]:
     """
@@ -432,46 +557,29 @@ def semantic_search(query: str, limit: int = 10) -> List[dict]:
     Returns:
         List of product dictionaries with pricing and details
     """
-    import asyncio
-    
     async def _search():
-        db = BargainBDatabase()
-        
         # Check if database is available
         if not db.connection_params:
             print("🔍 Using mock search data (database not available)")
             return _get_mock_search_results(query, limit)
             
         try:
-            await db.connect()
-            if not db.connection:
-                print("🔍 Database connection failed, using mock data")
-                return _get_mock_search_results(query, limit)
-                
+            # Connects lazily, so cached queries never open a connection
             documents = await db.semantic_product_search(query, limit=limit)
             # Convert Documents to dictionaries for easier use
             results = []
             for doc in documents:
-                store_prices_json = _extract_store_prices_from_doc(doc)
+                store_prices = _extract_store_prices_from_doc(doc)
                 
-                # Extract simple price from store_prices for compatibility
-                import json
-                import re
-                try:
-                    store_prices = json.loads(store_prices_json)
-                    simple_price = store_prices[0]['price'] if store_prices else 'Price not available'
-                except:
-                    # Extract price from content as fallback
-                    content = doc.page_content
-                    price_match = re.search(r'Best price: €([\d.,]+)', content)
-                    simple_price = f"€{price_match.group(1)}" if price_match else 'Price not available'
+                # Simple price from the best store price for compatibility
+                simple_price = store_prices[0]['price'] if store_prices else 'Price not available'
                 
                 result = {
                     'title': doc.metadata.get('title', 'Unknown Product'),
                     'brand': doc.metadata.get('brand', 'Unknown Brand'),
                     'quantity': doc.metadata.get('quantity', 'Unknown size'),
                     'price': simple_price,  # Simple price field for compatibility
-                    'store_prices': store_prices_json,  # Detailed store prices JSON
+                    'store_prices': json.dumps(store_prices),  # Detailed store prices JSON
                     'description': doc.metadata.get('description', ''),
                     'category': doc.metadata.get('category_path', 'Unknown'),
                     'gtin': doc.metadata.get('gtin', ''),
@@ -482,49 +590,16 @@ def semantic_search(query: str, limit: int = 10) -> List[dict]:
         except Exception as e:
             print(f"🔍 Database search failed: {e}, using mock data")
             return _get_mock_search_results(query, limit)
-        finally:
-            if db.connection:
-                await db.disconnect()
     
-    # Simplified approach - just use asyncio.run
+    # Run on the shared database loop so the pool is reused across searches
     try:
-        return asyncio.run(_search())
-    except RuntimeError as e:
-        if "cannot be called from a running event loop" in str(e):
-            # If we're in a running event loop, create a new thread
-            import threading
-            import queue
-            
-            result_queue = queue.Queue()
-            exception_queue = queue.Queue()
-            
-            def run_search():
-                try:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    result = loop.run_until_complete(_search())
-                    result_queue.put(result)
-                except Exception as e:
-                    exception_queue.put(e)
-                finally:
-                    loop.close()
-            
-            thread = threading.Thread(target=run_search)
-            thread.start()
-            thread.join(timeout=30)  # 30 second timeout
-            
-            if not exception_queue.empty():
-                print("🔍 Database search failed, using mock data")
-                return _get_mock_search_results(query, limit)
-            
-            if not result_queue.empty():
-                return result_queue.get()
-            else:
-                print("🔍 Database search timed out, using mock data")
-                return _get_mock_search_results(query, limit)
-        else:
-            print("🔍 Database search failed, using mock data")
-            return _get_mock_search_results(query, limit)
+        return _run_db_coroutine(_search())
+    except concurrent.futures.TimeoutError:
+        print("🔍 Database search timed out, using mock data")
+        return _get_mock_search_results(query, limit)
+    except Exception:
+        print("🔍 Database search failed, using mock data")
+        return _get_mock_search_results(query, limit)
 
 
 def _get_mock_search_results(query: str, limit: int = 10) -> List[dict]:
@@ -651,17 +726,16 @@ def _get_mock_search_results(query: str, limit: int = 10) -> List[dict]:
     return relevant_products[:limit]
 
 
-def _extract_store_prices_from_doc(doc: Document) -> str:
+def _extract_store_prices_from_doc(doc: Document) -> List[Dict[str, Any]]:
     """
-    Extract store prices from a document and format as JSON string.
+    Extract store prices from a document.
     
     Args:
         doc: Document with product information
         
     Returns:
-        JSON string with store pricing information
+        List of store pricing entries
     """
-    import json
     import re
     
     # Extract pricing info from content field
@@ -680,7 +754,7 @@ def _extract_store_prices_from_doc(doc: Document) -> str:
             'on_offer': False  # Default to false since we don't have promo price info
         }]
         
-        return json.dumps(price_info)
+        return price_info
     
     # Fallback to metadata if no content match
     price = doc.metadata.get('price', 0)
@@ -693,7 +767,7 @@ def _extract_store_prices_from_doc(doc: Document) -> str:
         'on_offer': False  # Default to false since we don't have promo price info
     }]
     
-    return json.dumps(price_info) 
+    return price_info
 
 
 def get_supabase_client():
@@ -701,8 +775,9 @@ def get_supabase_client():
     try:
         from supabase import create_client, Client
         
-        supabase_url = os.getenv('SUPABASE_URL')
-        supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+        env = _snapshot_env()
+        supabase_url = env['SUPABASE_URL']
+        supabase_key = env['SUPABASE_SERVICE_ROLE_KEY']
         
         if not supabase_url or not supabase_key:
             print("⚠️  Supabase credentials not found in environment variables")
@@ -730,29 +805,24 @@ def log_message_truncation(user_id: str, thread_id: str, original_count: int, tr
         summary: Generated summary
     """
     try:
-        # Use the existing database connection pattern
-        db = BargainBDatabase()
-        
         # Run the logging in an async context
         async def _log_truncation():
             try:
-                await db.connect()
+                if not db.pool:
+                    await db.connect()
                 
                 # Insert truncation log using asyncpg
-                await db.connection.execute("""
+                await db.pool.execute("""
                     INSERT INTO message_truncation_log (
                         user_id, thread_id, original_count, truncated_count, summary, created_at
                     ) VALUES ($1, $2, $3, $4, $5, $6)
                 """, user_id, thread_id, original_count, truncated_count, summary, datetime.now())
                 
-                await db.disconnect()
-                
             except Exception as e:
                 print(f"Error logging message truncation: {e}")
-                await db.disconnect()
         
-        # Run the async function
-        asyncio.run(_log_truncation())
+        # Run on the shared database loop, reusing the pool
+        _run_db_coroutine(_log_truncation())
         
     except Exception as e:
         print(f"Error in log_message_truncation: {e}") 
\ No newline at end of file